@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Benchmark für Fetcher und Parser des Crawlers – ohne Netzwerk.
+
+Alle HTTP-Requests des Crawlers werden auf einen lokalen Stand-in-Server
+umgeleitet, der aufgezeichnete Antworten (bench/fixtures) oder synthetische
+Seiten in der gewünschten Historien-Länge ausliefert.
+
+Usage:
+    python3 bench-crawler.py --record          # echte Antworten aufzeichnen (Netzwerk)
+    python3 bench-crawler.py                   # Benchmark (90 Tage, 5 Jahre, 20 Jahre)
+    python3 bench-crawler.py --sizes 90d --repeat 10 --output bench.json
+
+Ausgabe: JSON mit Laufzeit (min/median), Punkten pro Sekunde und
+Speicher-Spitze (tracemalloc) pro Funktion und Historien-Länge.
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import platform
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+import crawler
+
+FIXTURE_DIR = Path(__file__).parent / "bench" / "fixtures"
+SIZES = {"90d": 90, "5y": 5 * 365, "20y": 20 * 365}
+
+# Yahoo-Zeitraum pro Größe (wie im echten Crawl) und für die Aufzeichnung
+YAHOO_RANGES = {"90d": "3mo", "5y": "5y", "20y": "max", "recorded": "1y"}
+
+HTTP_FETCHERS = [
+    ("fetch_esyoil_heating_oil", lambda size: crawler.fetch_esyoil_heating_oil()),
+    ("fetch_clal_butter", lambda size: crawler.fetch_clal_butter()),
+    ("fetch_clal_cheese", lambda size: crawler.fetch_clal_cheese()),
+    ("fetch_clal_milk", lambda size: crawler.fetch_clal_milk()),
+    ("fetch_yahoo_batch", lambda size: crawler.fetch_yahoo_batch(crawler.yahoo_symbols(),
+                                                                YAHOO_RANGES[size])),
+]
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+def load_recorded() -> dict:
+    """Aufgezeichnete Antworten: {url: bytes}"""
+    index_path = FIXTURE_DIR / "index.json"
+    if not index_path.exists():
+        return {}
+    index = json.loads(index_path.read_text())
+    return {url: (FIXTURE_DIR / name).read_bytes() for url, name in index.items()}
+
+
+def synthetic_dates(days: int, step: int = 1, end: datetime = None) -> list:
+    end = end or datetime(2026, 2, 18)  # ein Mittwoch (CLAL-Butter notiert mittwochs)
+    return [end - timedelta(days=i) for i in range(0, days, step)][::-1]
+
+
+def synthetic_walk(n: int, base: float, spread: float, seed: int) -> list:
+    rng = random.Random(seed)
+    price, values = base, []
+    for _ in range(n):
+        price = max(base * 0.3, price + rng.uniform(-spread, spread))
+        values.append(price)
+    return values
+
+
+def synthetic_page(url: str, days: int) -> bytes:
+    """Seite im Format der echten Quelle mit `days` Tagen Historie"""
+    parts = urlparse(url)
+    query = parse_qs(parts.query)
+    filler = "<div class=\"nav\">Lorem ipsum 12 34 dolor</div>\n" * 400
+
+    if "yahoo" in parts.hostname:
+        symbols = query.get("symbols", [""])[0].split(",")
+        if "/chart/" in parts.path:
+            symbols = [unquote(parts.path.rsplit("/", 1)[-1])]
+        dates = synthetic_dates(days)
+        timestamps = [int(d.timestamp()) for d in dates]
+        results = []
+        for i, symbol in enumerate(symbols):
+            base = 1.08 if symbol == crawler.FX_SYMBOL else 100 + 50 * i
+            closes = [round(v, 4) for v in synthetic_walk(len(dates), base, base * 0.01, i)]
+            results.append({"symbol": symbol, "response": [{
+                "timestamp": timestamps,
+                "indicators": {"quote": [{"close": closes}]},
+            }]})
+        if "/chart/" in parts.path:
+            return json.dumps({"chart": {"result": [results[0]["response"][0]]}}).encode()
+        return json.dumps({"spark": {"result": results}}).encode()
+
+    section = query.get("section", [""])[0]
+    if section == "burro_germania":
+        weeks = synthetic_dates(days, 7)
+        values = synthetic_walk(len(weeks), 7000, 80, 1)
+        rows = "".join(
+            f"<tr><td>{d.strftime('%A %d %b %Y')}</td><td> {v:,.0f} {v + 200:,.0f} +0,5% </td></tr>\n"
+            .replace(",", ".")
+            for d, v in zip(weeks[::-1], values[::-1]))
+    elif section == "prezzi_prodotti_mmo":
+        weeks = synthetic_dates(days, 7)
+        values = synthetic_walk(len(weeks), 3400, 40, 2)
+        rows = "".join(f"<tr><td>{d.strftime('%d %b %Y')}   {v:,.0f}   -1,2%</td></tr>\n".replace(",", ".")
+                       for d, v in zip(weeks[::-1], values[::-1]))
+    elif section == "latte_europa_mmo":
+        months = sorted({d.replace(day=1) for d in synthetic_dates(days)})
+        values = synthetic_walk(len(months), 45, 0.8, 3)
+        rows = "".join(f"<tr><td>{d.strftime('%b %Y')}   {v:.2f}</td></tr>\n"
+                       for d, v in zip(months[::-1], values[::-1]))
+    elif "esyoil" in parts.hostname:
+        rows = ("<span class=\"text-[1.75rem] font-bold\">96,61 €</span>\n"
+                + "<li>Region 12,50 €</li>\n" * 50)
+    else:
+        return b""
+
+    return f"<html><head><title>bench</title></head><body>{filler}<table>{rows}</table>{filler}</body></html>".encode()
+
+
+# =============================================================================
+# STAND-IN SERVER
+# =============================================================================
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Liefert pro Original-URL die Fixture aus (gzip, Keep-Alive wie echte Server)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = unquote(self.path.lstrip("/"))
+        body = self.server.resolve(url)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.recorded = {}
+        self.days = None
+
+    def resolve(self, url: str):
+        if self.days is None:
+            return self.recorded.get(url)
+        return synthetic_page(url, self.days)
+
+
+class ReplayClient(crawler.HttpClient):
+    """HttpClient, der jede URL auf den lokalen Fixture-Server umbiegt"""
+
+    def __init__(self, address: tuple):
+        super().__init__(timeout=10)
+        self.base = f"http://{address[0]}:{address[1]}/"
+        self.bytes = 0
+
+    def request(self, method, url, headers=None, timeout=None):
+        if not url.startswith(self.base):
+            url = self.base + quote(url, safe="")
+        response = super().request(method, url, headers=headers, timeout=timeout)
+        self.bytes += len(response.body)
+        return response
+
+
+class RecordingClient(crawler.HttpClient):
+    """HttpClient, der alle Antworten für die Fixtures mitschreibt"""
+
+    def __init__(self):
+        super().__init__()
+        self.responses = {}
+
+    def request(self, method, url, headers=None, timeout=None):
+        response = super().request(method, url, headers=headers, timeout=timeout)
+        self.responses[url] = response.body
+        return response
+
+
+# =============================================================================
+# MESSUNG
+# =============================================================================
+
+def measure(fn, repeat: int) -> dict:
+    """Laufzeit (min/median über repeat Läufe) und Speicher-Spitze eines Aufrufs"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - started)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if isinstance(result, crawler.YahooBatch):
+        points = sum(len(h) for h in result.histories.values())
+    else:
+        points = len(result)
+    best = min(timings)
+    return {
+        "points": points,
+        "seconds_min": round(best, 6),
+        "seconds_median": round(statistics.median(timings), 6),
+        "points_per_s": round(points / best) if best else None,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def bench_fetchers(server: FixtureServer, client: ReplayClient, label: str, repeat: int) -> list:
+    results = []
+    for name, call in HTTP_FETCHERS:
+        before = client.bytes
+        entry = {"function": name, "size": label}
+        entry.update(measure(lambda: call(label), repeat))
+        entry["bytes_per_call"] = (client.bytes - before) // (repeat + 1)
+        results.append(entry)
+    return results
+
+
+def bench_pure(label: str, days: int, repeat: int) -> list:
+    """convert_prices, interpolate_daily und save_data auf synthetischen Serien"""
+    dates = [d.strftime("%Y-%m-%d") for d in synthetic_dates(days)]
+    prices = [{"date": d, "price": round(v, 4)}
+              for d, v in zip(dates, synthetic_walk(len(dates), 150, 1.5, 4))]
+    fx = [{"date": d, "price": round(v, 4)}
+          for d, v in zip(dates, synthetic_walk(len(dates), 1.08, 0.004, 5))]
+    weekly = [{"date": d.strftime("%Y-%m-%d"), "price": round(v, 2)}
+              for d, v in zip(synthetic_dates(days, 7), synthetic_walk(days // 7 + 1, 7000, 80, 6))]
+    meta = {"name": "Bench", "unit": "EUR/t"}
+
+    results = []
+    for name, fn in [
+        ("convert_prices", lambda: crawler.convert_prices(prices, 1.08, convert_lb=True, fx_history=fx)),
+        ("interpolate_daily", lambda: crawler.interpolate_daily(weekly)),
+        ("save_data", lambda: crawler.save_data("bench", prices, meta, replace=True) or prices),
+    ]:
+        entry = {"function": name, "size": label}
+        entry.update(measure(fn, repeat))
+        results.append(entry)
+    return results
+
+
+def record():
+    """Ruft alle HTTP-Quellen einmal echt ab und speichert die Antworten"""
+    client = RecordingClient()
+    crawler._http_client = client
+    crawler.get_http_cache().enabled = False
+    for name, call in HTTP_FETCHERS:
+        print(f"Aufzeichnen: {name}")
+        call("recorded")
+
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    index = {}
+    for i, (url, body) in enumerate(sorted(client.responses.items())):
+        name = f"{i:02d}-{urlparse(url).hostname}.bin"
+        (FIXTURE_DIR / name).write_bytes(body)
+        index[url] = name
+    (FIXTURE_DIR / "index.json").write_text(json.dumps(index, indent=2))
+    print(f"✓ {len(index)} Antworten in {FIXTURE_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Benchmark für crawler.py")
+    parser.add_argument("--record", action="store_true", help="Echte Antworten nach bench/fixtures aufzeichnen")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="Historien-Längen, z.B. 90d,5y,20y")
+    parser.add_argument("--repeat", type=int, default=5, help="Läufe pro Messung")
+    parser.add_argument("--output", help="JSON zusätzlich in diese Datei schreiben")
+    args = parser.parse_args()
+
+    if args.record:
+        record()
+        return
+
+    # Crawler-Ausgaben (Store, JSON, .gz) in ein Temp-Verzeichnis umleiten
+    workdir = tempfile.TemporaryDirectory(prefix="bench-crawler-")
+    crawler.DATA_DIR = Path(workdir.name)
+    crawler._store = crawler.PriceStore(crawler.DATA_DIR / "prices.db")
+    # Jeder Lauf soll wirklich abrufen und parsen (kein Unchanged aus dem HttpCache)
+    crawler._http_cache = crawler.HttpCache(crawler.DATA_DIR / "http-cache", enabled=False)
+    # Ein Fehlschlag soll die übrigen Messungen nicht über den Circuit Breaker verfälschen
+    crawler._breakers = crawler.CircuitBreakers(enabled=False)
+
+    server = FixtureServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ReplayClient(server.server_address)
+    crawler._http_client = client
+
+    results = []
+    try:
+        server.recorded = load_recorded()
+        if server.recorded:
+            results += bench_fetchers(server, client, "recorded", args.repeat)
+
+        for label in args.sizes.split(","):
+            server.days = SIZES[label]
+            results += bench_fetchers(server, client, label, args.repeat)
+            results += bench_pure(label, SIZES[label], args.repeat)
+    finally:
+        server.shutdown()
+        client.close()
+        workdir.cleanup()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "fixtures": "recorded+synthetic" if server.recorded else "synthetic",
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
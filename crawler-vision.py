@@ -2,52 +2,56 @@
 """
 Vision-basierter Weizen-Crawler für finanzen.net
 Macht Screenshot und nutzt Vision-Model zur Preis-Extraktion
+
+Nutzt den BrowserService aus crawler.py (ein Browser, isolierter Context,
+Ads/Tracking blockiert, Warten auf Preis-Element statt fester Pause).
 """
 
-from playwright.sync_api import sync_playwright
+from crawler import BrowserService, goto_and_wait
 import base64
 import json
 from pathlib import Path
 import os
 
-def fetch_wheat_price_via_vision():
+# Deutscher Preis mit Komma (z.B. "226,83") - sobald sichtbar, ist der Kurs geladen
+PRICE_SELECTOR = 'text=/\\d{3},\\d{2}/'
+
+def fetch_wheat_price_via_vision(service: BrowserService = None):
     """Holt Weizen-Preis via Screenshot + Vision"""
     print("  Vision-Scraping finanzen.net...")
     
+    own_service = service is None
+    service = service or BrowserService()
+    
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Zur Weizen-Seite
-            page.goto('https://www.finanzen.net/rohstoffe/weizenpreis', 
-                     wait_until='networkidle', 
-                     timeout=30000)
-            
-            # Warte auf Preis-Laden
-            page.wait_for_timeout(5000)
+        # Bilder/Fonts laden, damit der Screenshot wie im Browser aussieht
+        with service.page(block_resources=False) as page:
+            # Zur Weizen-Seite, warten bis ein Preis sichtbar ist
+            goto_and_wait(page, 'https://www.finanzen.net/rohstoffe/weizenpreis',
+                          selector=PRICE_SELECTOR, timeout=30000)
             
             # Screenshot machen
             screenshot_path = '/tmp/finanzen-wheat.png'
             page.screenshot(path=screenshot_path, full_page=False)
-            
-            browser.close()
-            
-            print(f"  Screenshot gespeichert: {screenshot_path}")
-            
-            # Vision-Model nutzen (simuliert - müsste über API gehen)
-            # Hier nur als Proof-of-Concept
-            print("  Vision-Analyse würde hier laufen...")
-            print("  Prompt: 'Finde den aktuellen Weizen-Preis in EUR/Tonne auf diesem Screenshot'")
-            
-            # In echter Implementierung:
-            # price = analyze_with_vision(screenshot_path)
-            
-            return None  # Placeholder
+        
+        print(f"  Screenshot gespeichert: {screenshot_path}")
+        
+        # Vision-Model nutzen (simuliert - müsste über API gehen)
+        # Hier nur als Proof-of-Concept
+        print("  Vision-Analyse würde hier laufen...")
+        print("  Prompt: 'Finde den aktuellen Weizen-Preis in EUR/Tonne auf diesem Screenshot'")
+        
+        # In echter Implementierung:
+        # price = analyze_with_vision(screenshot_path)
+        
+        return None  # Placeholder
             
     except Exception as e:
         print(f"  Vision-Fehler: {e}")
         return None
+    finally:
+        if own_service:
+            service.close()
 
 # Test
 if __name__ == "__main__":
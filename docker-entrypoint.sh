@@ -1,13 +1,32 @@
 #!/bin/bash
 set -e
 
-# Initial data crawl on startup
-echo "Running initial data crawl..."
-python3 /app/crawler.py || echo "Initial crawl failed, continuing..."
-
-# Start cron in background
-cron
+# Crawler-Zeitplan im Hintergrund: jede Quelle in ihrem eigenen Takt
+# (config.json → crawler.schedule.sources), Zustand in data/prices.db.
+# Sind die Daten beim Start noch frisch, wird nichts abgerufen.
+# docker stop → SIGTERM an beide Prozesse: Scheduler und Server schließen
+# ihren (über alle Läufe offenen) Browser selbst.
+echo "Starting crawl scheduler..."
+(
+    child=
+    trap 'kill -TERM $child 2>/dev/null; wait $child; exit 0' TERM
+    while true; do
+        python3 /app/crawler.py --schedule &
+        child=$!
+        wait $child || echo "Scheduler beendet, Neustart in 60s..."
+        sleep 60 &
+        wait $!
+    done
+) &
+scheduler=$!
 
 # Start simple HTTP server
 echo "Starting web server on port 8080..."
-exec python3 /app/server.py
+python3 /app/server.py &
+server=$!
+trap 'kill -TERM $scheduler $server 2>/dev/null' TERM INT
+wait $server || true
+# Nach einem Signal kehrt wait sofort zurück → beide zu Ende laufen lassen
+wait $server 2>/dev/null || true
+kill -TERM $scheduler 2>/dev/null || true
+wait $scheduler 2>/dev/null || true
@@ -5,16 +5,682 @@ Serviert statische Dateien (HTML + JSON) + API für Crawler-Refresh
 """
 
 from http.server import HTTPServer, SimpleHTTPRequestHandler
-import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import email.utils
+import gzip
+import hashlib
 import json
 import os
+import re
+import signal
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, parse_qs
+
+import crawler
+
+# Obergrenze für Punkte pro Chart-Antwort (/api/prices?points=...)
+MAX_POINTS = 2000
+
+# ChartCache: max. gecachte Chart-Antworten (älteste Zugriffe fliegen zuerst)
+CHART_CACHE_MAX_ENTRIES = 256
+
+# Threaded-Modus: Worker-Threads, max. offene Verbindungen, Socket-Timeout pro Client
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_CONNECTIONS = 64
+REQUEST_TIMEOUT = 30
+
+# /api/events: Prüfintervall für neue Daten, Heartbeat, max. gleichzeitige Streams,
+# ab wie vielen neuen Punkten statt eines Deltas "reload" geschickt wird
+EVENTS_POLL_SECONDS = 2
+EVENTS_HEARTBEAT_SECONDS = 25
+EVENTS_MAX_CLIENTS = 32
+EVENTS_MAX_DELTA = 400
+
+# /metrics: Bucket-Grenzen (Sekunden) der Latenz-Histogramme pro Route
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# POST /api/refresh: Mindestabstand pro Quelle, wie lange fertige Jobs abrufbar bleiben
+REFRESH_MIN_INTERVAL = 300
+REFRESH_KEEP_JOBS = 50
+
+# Schützt read-modify-write von config.json (POST /api/settings)
+config_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def query_prices(store, commodity, period=None, start=None, end=None, points=None, method='lttb'):
+    """
+    Preise eines Rohstoffs für einen Zeitraum (period aus config.json)
+    oder Datumsbereich, optional auf `points` Punkte reduziert
+    (`method`: siehe DOWNSAMPLE_METHODS).
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ApiError(400, f'Unbekannte Methode: {method}')
+    meta = store.get_meta(commodity)
+    if meta is None:
+        raise ApiError(404, f'Unbekannter Rohstoff: {commodity}')
+    
+    if period:
+        periods = crawler.load_config().get('periods', {})
+        if period not in periods:
+            raise ApiError(400, f'Unbekannter Zeitraum: {period}')
+        # Zeitraum endet am letzten gespeicherten Tag (nicht heute)
+        last = store.last_date(commodity)
+        if last:
+            first = datetime.strptime(last, '%Y-%m-%d') - timedelta(days=periods[period]['days'] - 1)
+            start, end = first.strftime('%Y-%m-%d'), last
+    
+    series = store.series(commodity, start=start, end=end)
+    
+    # Zeitraum-Kennzahlen führt der Store laufend mit (gleiches Fenster)
+    stats = None
+    if period:
+        window = store.period_stats(commodity).get(period)
+        if window and window['from'] == start and window['to'] == end:
+            stats = {'min': window['min'], 'max': window['max'], 'avg': window['avg']}
+    if stats is None:
+        stats = series.stats()
+    
+    if points:
+        series = DOWNSAMPLE_METHODS[method](series, min(points, MAX_POINTS))
+    
+    return {
+        'commodity': meta['name'],
+        'unit': meta['unit'],
+        'updated': meta['updated'],
+        'note': meta['note'],
+        'stale': meta['stale'],
+        'period': period,
+        'from': start,
+        'to': end,
+        'stats': stats,
+        'prices': series.to_dicts()
+    }
+
+
+class ChartCache:
+    """
+    Fertige query_prices()-Ergebnisse pro (Rohstoff, Zeitraum, Auflösung).
+    
+    Downsampling läuft so nur einmal pro Store-Generation; ein Crawl
+    (bump_generation) verwirft alle Einträge beim nächsten Zugriff.
+    Gecacht werden nur Zeiträume (period), freie Datumsbereiche (from/to)
+    werden pro Anfrage berechnet; höchstens max_entries Einträge (LRU).
+    """
+    
+    def __init__(self, max_entries=CHART_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, store, commodity, period=None, start=None, end=None, points=None, method='lttb'):
+        points = min(points, MAX_POINTS) if points else None
+        if not period:
+            return query_prices(store, commodity, start=start, end=end, points=points, method=method)
+        
+        generation = store.generation()
+        # Tage gehören zum Schlüssel (Zeiträume lassen sich über /api/settings ändern)
+        days = crawler.load_config().get('periods', {}).get(period, {}).get('days')
+        key = (commodity, period, days, points, method)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == generation:
+                self._entries.move_to_end(key)
+                return entry[1]
+        
+        data = query_prices(store, commodity, period=period, points=points, method=method)
+        
+        with self._lock:
+            if any(v[0] != generation for v in self._entries.values()):
+                self._entries = OrderedDict((k, v) for k, v in self._entries.items() if v[0] == generation)
+            self._entries[key] = (generation, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+
+chart_cache = ChartCache()
+
+
+class SnapshotCache:
+    """
+    Fertig serialisierte /api/snapshot-Antworten pro (period, points, method).
+    
+    Gebaut wird nur einmal pro Store-Generation (steigt bei jedem
+    save_data des Crawlers); danach kostet eine Anfrage eine einzige
+    SQLite-Abfrage für die Generation.
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def get(self, store, period, points, method='lttb'):
+        generation = store.generation()
+        key = (period, points, method)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == generation:
+                return entry[1:]
+        
+        commodities = {}
+        for commodity in crawler.COMMODITIES:
+            try:
+                commodities[commodity] = chart_cache.get(store, commodity, period=period, points=points, method=method)
+            except ApiError as e:
+                if e.status != 404:
+                    raise
+        
+        updated = max((c['updated'] for c in commodities.values() if c['updated']), default=None)
+        body = json.dumps({
+            'generation': generation,
+            'period': period,
+            'updated': updated,
+            'commodities': commodities
+        }, separators=(',', ':'), ensure_ascii=False).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        gzipped = gzip.compress(body, mtime=0)
+        
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] == generation}
+            self._entries[key] = (generation, body, etag, gzipped)
+        return body, etag, gzipped
+
+
+snapshot_cache = SnapshotCache()
+
+
+class RefreshQueue:
+    """
+    Refresh-Jobs für POST /api/refresh, im Serverprozess abgearbeitet.
+    
+    - Ein Worker-Thread: es läuft immer nur ein Crawl (crawl_concurrent()
+      unter crawl_lock(), also auch nie parallel zum Zeitplan)
+    - Anfragen werden zusammengelegt: deckt der laufende Job die gewünschten
+      Rohstoffe ab, gibt es dessen ID; sonst wandern sie in den wartenden Job
+    - Rate-Limit pro Quelle (REFRESH_MIN_INTERVAL): kürzlich abgerufene
+      Rohstoffe werden ausgelassen (`skipped`), sind alle betroffen → 429
+    - Status und Fortschritt pro Job über GET /api/refresh/<id>
+    """
+    
+    def __init__(self, min_interval=REFRESH_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._jobs = {}
+        self._pending = None
+        self._running = None
+        self._last = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._worker = None
+    
+    def submit(self, commodities=None):
+        """Neuer bzw. zusammengelegter Job → Job-Status (dict)"""
+        wanted = list(commodities or crawler.COMMODITIES)
+        unknown = [c for c in wanted if c not in crawler.COMMODITIES]
+        if unknown:
+            raise ApiError(400, f'Unbekannter Rohstoff: {", ".join(unknown)}')
+        
+        with self._lock:
+            running = self._running
+            if running and set(wanted) <= set(running['commodities']):
+                return self._status(running)
+            
+            now = time.monotonic()
+            waits = {}
+            for c in wanted:
+                last = self._last.get(crawler.source_of(crawler.COMMODITIES[c]))
+                if last is not None and now - last < self.min_interval:
+                    waits[c] = int(self.min_interval - (now - last)) + 1
+            wanted = [c for c in wanted if c not in waits]
+            if not wanted:
+                error = ApiError(429, f'Gerade aktualisiert, erneut in {min(waits.values())} s möglich')
+                error.retry_after = min(waits.values())
+                raise error
+            
+            job = self._pending
+            if job is None:
+                job = self._pending = {
+                    'id': uuid.uuid4().hex[:12],
+                    'state': 'queued',
+                    'commodities': [],
+                    'skipped': {},
+                    'results': {},
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'started': None,
+                    'finished': None,
+                    'error': None,
+                }
+                self._jobs[job['id']] = job
+                while len(self._jobs) > REFRESH_KEEP_JOBS:
+                    self._jobs.pop(next(iter(self._jobs)))
+            job['commodities'] += [c for c in wanted if c not in job['commodities']]
+            job['skipped'].update(waits)
+            
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='refresh', daemon=True)
+                self._worker.start()
+            self._wakeup.notify()
+            return self._status(job)
+    
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._status(job) if job else None
+    
+    def _status(self, job):
+        status = dict(job, commodities=list(job['commodities']), skipped=dict(job['skipped']),
+                      results=dict(job['results']))
+        status['progress'] = {'done': len(job['results']), 'total': len(job['commodities'])}
+        return status
+    
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._pending is None:
+                    self._wakeup.wait()
+                job = self._running = self._pending
+                self._pending = None
+                job['state'] = 'running'
+                job['started'] = datetime.now().isoformat(timespec='seconds')
+                commodities = {c: crawler.COMMODITIES[c] for c in job['commodities']}
+                # Rate-Limit gilt ab Start (weitere Klicks landen im laufenden Job)
+                for meta in commodities.values():
+                    self._last[crawler.source_of(meta)] = time.monotonic()
+            
+            def progress(commodity, status):
+                with self._lock:
+                    job['results'][commodity] = status
+            
+            try:
+                with crawler.crawl_lock():
+                    # Kein Umleiten von sys.stdout: Request-Threads loggen parallel weiter
+                    crawler.crawl_concurrent(commodities, incremental=True, progress=progress,
+                                             trigger='refresh', buffer_output=False)
+                state, error = 'done', None
+            except Exception as e:
+                print(f"Refresh-Job {job['id']} fehlgeschlagen: {e}")
+                state, error = 'failed', str(e)
+            
+            with self._lock:
+                job['state'] = state
+                job['error'] = error
+                job['finished'] = datetime.now().isoformat(timespec='seconds')
+                self._running = None
+
+
+refresh_queue = RefreshQueue()
+
+
+def sse_event(event, data, event_id=None):
+    """Ein Server-Sent Event (kompaktes JSON in einer data-Zeile)"""
+    lines = f'event: {event}\n'
+    if event_id is not None:
+        lines += f'id: {event_id}\n'
+    lines += 'data: ' + json.dumps(data, separators=(',', ':'), ensure_ascii=False) + '\n\n'
+    return lines.encode()
+
+
+class EventHub:
+    """
+    GET /api/events (Server-Sent Events): neue Daten werden gepusht statt gepollt.
+    
+    - Ein Watcher-Thread prüft alle EVENTS_POLL_SECONDS die Store-Generation
+      (steigt bei jedem save_data, auch aus dem Crawler-/Zeitplan-Prozess)
+    - Pro geändertem Rohstoff ein Event "prices" mit Delta: Punkte ab dem
+      bisher letzten Datum (`from`), `periodStats`, `updated`; passt das
+      Delta nicht (Historie ersetzt, zu viele Punkte) → `reload: true`
+    - Beim Verbinden ein Event "hello" mit der aktuellen Generation, damit
+      ein Client Änderungen zwischen Laden und Verbinden erkennt
+    - Streams belegen keinen Worker im Thread-Pool: nach den Headern
+      übernimmt der Hub den Socket, geschrieben wird nur vom Watcher
+      (Heartbeat-Kommentar alle EVENTS_HEARTBEAT_SECONDS, tote Clients fliegen raus)
+    """
+    
+    def __init__(self):
+        self._clients = []
+        self._lock = threading.Lock()
+        # Hello/Deltas und Generationswechsel nacheinander (kein Client verpasst ein Delta)
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._generation = None
+        self._seen = {}
+    
+    def full(self):
+        return self.client_count() >= EVENTS_MAX_CLIENTS
+    
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+    
+    def add(self, sock):
+        """Übernimmt einen Socket (Header sind schon gesendet)"""
+        store = crawler.get_store()
+        sock.settimeout(5)
+        with self._send_lock:
+            with self._lock:
+                if self._thread is None:
+                    self._generation = store.generation()
+                    self._seen = self._state(store)
+                    self._thread = threading.Thread(target=self._watch, name='events', daemon=True)
+                    self._thread.start()
+                self._clients.append(sock)
+            self._send([sock], b'retry: 5000\n' + sse_event('hello', {'generation': self._generation},
+                                                             self._generation))
+    
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for sock in clients:
+            self._drop(sock)
+    
+    def _state(self, store):
+        """{commodity: (updated, letztes Datum, Anzahl, veraltet seit)}"""
+        state = {}
+        for commodity in crawler.COMMODITIES:
+            meta = store.get_meta(commodity)
+            if meta:
+                state[commodity] = (meta['updated'], store.last_date(commodity), store.count(commodity),
+                                    (meta['stale'] or {}).get('since'))
+        return state
+    
+    def _deltas(self, store, generation):
+        state = self._state(store)
+        for commodity, current in state.items():
+            previous = self._seen.get(commodity)
+            if previous == current:
+                continue
+            meta = store.get_meta(commodity)
+            event = {'commodity': commodity, 'generation': generation, 'updated': meta['updated'],
+                     'note': meta['note'], 'stale': meta['stale'], 'count': current[2]}
+            if previous and previous[1]:
+                prices = store.query(commodity, start=previous[1])
+                # Nur angehängt bzw. letzten Tag aktualisiert? Sonst neu laden
+                appended = prices and prices[0]['date'] == previous[1] and current[2] == previous[2] - 1 + len(prices)
+                if appended and len(prices) <= EVENTS_MAX_DELTA:
+                    event.update({'from': previous[1], 'prices': prices,
+                                  'periodStats': store.period_stats(commodity)})
+                else:
+                    event['reload'] = True
+            else:
+                event['reload'] = True
+            yield sse_event('prices', event, generation)
+        self._seen = state
+    
+    def _watch(self):
+        store = crawler.get_store()
+        last_beat = time.monotonic()
+        while True:
+            time.sleep(EVENTS_POLL_SECONDS)
+            with self._send_lock:
+                with self._lock:
+                    clients = list(self._clients)
+                try:
+                    generation = store.generation()
+                    if generation != self._generation:
+                        if clients:
+                            events = b''.join(self._deltas(store, generation))
+                            self._send(clients, events)
+                            last_beat = time.monotonic()
+                        else:
+                            self._seen = self._state(store)
+                        self._generation = generation
+                except Exception as e:
+                    print(f"Events: {e}")
+                
+                if clients and time.monotonic() - last_beat >= EVENTS_HEARTBEAT_SECONDS:
+                    self._send(clients, b': ping\n\n')
+                    last_beat = time.monotonic()
+    
+    def _send(self, clients, payload):
+        for sock in clients:
+            try:
+                sock.sendall(payload)
+            except OSError:
+                with self._lock:
+                    if sock in self._clients:
+                        self._clients.remove(sock)
+                self._drop(sock)
+    
+    def _drop(self, sock):
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+
+event_hub = EventHub()
+
+
+def route_of(path):
+    """Route-Label für die Latenz-Histogramme (ohne IDs/Dateinamen, begrenzte Anzahl)"""
+    path = urlsplit(path).path
+    if path.startswith('/api/refresh/'):
+        return '/api/refresh/<id>'
+    if path.startswith('/api/') or path == '/metrics':
+        return path if path in ('/api/prices', '/api/snapshot', '/api/events', '/api/refresh',
+                                '/api/settings', '/metrics') else '/api/other'
+    if path.startswith('/data/'):
+        return '/data/'
+    if path.startswith('/dashboard/'):
+        return '/dashboard/'
+    return 'other'
+
+
+class RequestMetrics:
+    """Latenz-Histogramme pro (Route, Methode) für /metrics"""
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, route, method, seconds):
+        with self._lock:
+            series = self._series.get((route, method))
+            if series is None:
+                series = self._series[(route, method)] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            series[1] += 1
+            series[2] += seconds
+    
+    def exposition(self):
+        lines = [
+            '# HELP rohstoff_http_request_duration_seconds Bearbeitungszeit pro Request',
+            '# TYPE rohstoff_http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            series = {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+        for (route, method), (counts, count, total) in sorted(series.items()):
+            labels = f'route="{route}",method="{method}"'
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'rohstoff_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'rohstoff_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'rohstoff_http_request_duration_seconds_count{{{labels}}} {count}')
+            lines.append(f'rohstoff_http_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+# CrawlMetrics-Namen → (Metrik, Typ der Phase), Rest wird als rohstoff_crawl_<name> exportiert
+CRAWL_PHASES = ('dns', 'connect', 'tls', 'wait', 'transfer', 'parse', 'browser_launch',
+                'browser_page', 'fetch', 'save')
+
+
+def crawl_exposition(store):
+    """Messwerte des letzten Laufs pro Quelle aus dem Store (Prometheus-Textformat)"""
+    latest = store.latest_metrics()
+    lines = [
+        '# HELP rohstoff_crawl_phase_seconds Dauer pro Phase im letzten Lauf der Quelle',
+        '# TYPE rohstoff_crawl_phase_seconds gauge',
+    ]
+    for source, values in sorted(latest.items()):
+        for phase in CRAWL_PHASES:
+            if f'{phase}_seconds' in values:
+                lines.append(f'rohstoff_crawl_phase_seconds{{source="{source}",phase="{phase}"}} '
+                             f'{values[phase + "_seconds"]:.6f}')
+    for name, help_text in (('requests', 'HTTP-Requests'), ('bytes', 'Empfangene Bytes (komprimiert)'),
+                            ('points', 'Geparste Punkte'), ('fallback', 'Fallback benutzt (1/0)'),
+                            ('unchanged', 'Quelle unverändert (HttpCache, 1/0)'),
+                            ('stale', 'Rohstoffe als veraltet markiert'),
+                            ('retries', 'HTTP-Wiederholungen'),
+                            ('breaker_skips', 'Vom Circuit Breaker übersprungene Requests')):
+        lines.append(f'# HELP rohstoff_crawl_{name} {help_text} im letzten Lauf der Quelle')
+        lines.append(f'# TYPE rohstoff_crawl_{name} gauge')
+        for source, values in sorted(latest.items()):
+            lines.append(f'rohstoff_crawl_{name}{{source="{source}"}} {values.get(name, 0):g}')
+    lines.append('# HELP rohstoff_crawl_last_run_timestamp_seconds Start des letzten Laufs der Quelle')
+    lines.append('# TYPE rohstoff_crawl_last_run_timestamp_seconds gauge')
+    for source, values in sorted(latest.items()):
+        started = datetime.fromisoformat(values['started']).timestamp()
+        lines.append(f'rohstoff_crawl_last_run_timestamp_seconds{{source="{source}"}} {started:.0f}')
+    
+    breakers = store.get_states('breaker:')
+    lines.append('# HELP rohstoff_breaker_open Host vom Circuit Breaker gesperrt (1/0)')
+    lines.append('# TYPE rohstoff_breaker_open gauge')
+    now = datetime.now()
+    for host, state in sorted(breakers.items()):
+        is_open = bool(state.get('openUntil')) and datetime.fromisoformat(state['openUntil']) > now
+        lines.append(f'rohstoff_breaker_open{{host="{host}"}} {int(is_open)}')
+    
+    runs = store.crawl_runs(1)
+    if runs:
+        lines += [
+            '# HELP rohstoff_crawl_duration_seconds Dauer des letzten Crawl-Laufs',
+            '# TYPE rohstoff_crawl_duration_seconds gauge',
+            f'rohstoff_crawl_duration_seconds{{trigger="{runs[0]["trigger"]}"}} {runs[0]["duration"]:.3f}',
+            '# HELP rohstoff_crawl_runs_total Gespeicherte Crawl-Läufe (fortlaufende Nummer)',
+            '# TYPE rohstoff_crawl_runs_total counter',
+            f'rohstoff_crawl_runs_total {runs[0]["run"]}',
+        ]
+    return lines
+
+# Bei Bedarf erzeugte data/<commodity>.json: {commodity: (generation, body, etag)}
+_exports = {}
+_exports_lock = threading.Lock()
+
+
+# Cache-Lebensdauer statischer Dateien (dashboard/); Daten werden immer revalidiert
+STATIC_MAX_AGE = 3600
+
+_etags = {}
+_etags_lock = threading.Lock()
+
+
+def file_etag(path, st):
+    """
+    Strong-ETag einer Datei.
+    
+    Für data/*.json kommt er vom Crawler (beim Schreiben berechnet, im
+    Store hinterlegt), sonst wird er einmal pro (mtime, size) berechnet
+    und im Speicher gehalten.
+    """
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _etags_lock:
+        etag = _etags.get(key)
+    if etag:
+        return etag
+    
+    if os.path.dirname(path) == str(crawler.DATA_DIR):
+        recorded = crawler.get_store().get_state(f"etag:{os.path.basename(path)}")
+        if recorded and recorded['mtime_ns'] == st.st_mtime_ns and recorded['size'] == st.st_size:
+            etag = recorded['etag']
+    
+    if not etag:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+        etag = '"' + sha.hexdigest() + '"'
+    
+    with _etags_lock:
+        # Veraltete Einträge derselben Datei verwerfen
+        for old in [k for k in _etags if k[0] == path]:
+            del _etags[old]
+        _etags[key] = etag
+    return etag
+
+
+# Vorkomprimierte Varianten in Präferenz-Reihenfolge: (Content-Encoding, Dateiendung)
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+
+def accepted_encodings(header):
+    """Encodings aus Accept-Encoding (ohne q=0)"""
+    encodings = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def precompressed_variant(path, st, accept_encoding):
+    """(encoding, pfad) der besten vorkomprimierten Variante, die nicht älter als die Datei ist"""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding not in accepted:
+            continue
+        try:
+            if os.stat(path + suffix).st_mtime_ns >= st.st_mtime_ns:
+                return encoding, path + suffix
+        except OSError:
+            continue
+    return None, path
+
+
+def precompress_static(directory):
+    """Legt beim Start .gz/.br-Varianten der statischen Dateien an"""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.gz', '.br', '.png', '.jpg')):
+                continue
+            path = os.path.join(root, name)
+            try:
+                crawler.write_precompressed(path)
+            except OSError as e:
+                print(f"Vorkomprimieren fehlgeschlagen ({path}): {e}")
+
+
+def warm_etags(directory):
+    """Berechnet die ETags aller statischen Dateien beim Start"""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(('.gz', '.br')):
+                continue
+            path = os.path.join(root, name)
+            file_etag(path, os.stat(path))
+
+
 
 class DashboardHandler(SimpleHTTPRequestHandler):
+    # Langsame/hängende Clients blockieren keinen Worker länger als das
+    timeout = REQUEST_TIMEOUT
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, directory="/app", **kwargs)
     
     def do_GET(self):
         """Handle GET requests - nur /dashboard/ und /data/ erlauben"""
+        self.cache_control = None
+        self.etag = None
+        self.vary = False
+        self.retry_after = None
+        
         # Root redirect zu /dashboard/
         if self.path == '/' or self.path == '':
             self.send_response(301)
@@ -27,43 +693,316 @@ class DashboardHandler(SimpleHTTPRequestHandler):
             self.handle_settings_get()
             return
         
+        url = urlsplit(self.path)
+        match = re.match(r'^/api/refresh/(\w+)$', url.path)
+        if match:
+            self.handle_refresh_status(match.group(1))
+            return
+        if url.path == '/api/prices':
+            self.handle_prices(parse_qs(url.query))
+            return
+        if url.path == '/api/snapshot':
+            self.handle_snapshot(parse_qs(url.query))
+            return
+        if url.path == '/api/events':
+            self.handle_events()
+            return
+        if url.path == '/metrics':
+            self.handle_metrics()
+            return
+        
         # Nur bestimmte Pfade erlauben
         allowed_paths = ['/dashboard/', '/data/', '/config.json']
         if not any(self.path.startswith(p) for p in allowed_paths):
             self.send_error(403, "Forbidden")
             return
         
+        # Datei fehlt (z.B. nur im Store vorhanden) → aus dem Store erzeugen
+        match = re.match(r'^/data/(\w+)\.json$', self.path)
+        if match and not os.path.exists(self.translate_path(self.path)):
+            self.handle_store_export(match.group(1))
+            return
+        
         # Standard GET handler
         super().do_GET()
     
+    def not_modified(self, st):
+        """
+        If-None-Match passt zum ETag bzw. - nur ohne If-None-Match -
+        If-Modified-Since ist nicht älter als die Datei (gilt für jede Variante).
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return self.etag in if_none_match or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if not if_modified_since:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Last-Modified hat Sekunden-Auflösung
+        return int(st.st_mtime) <= since.timestamp()
+    
+    def send_head(self):
+        """
+        Statische Dateien mit ETag/Last-Modified; If-None-Match bzw.
+        If-Modified-Since → 304 (auch für vorkomprimierte Varianten).
+        
+        Gibt es eine passende vorkomprimierte Variante (.br/.gz) und der
+        Client akzeptiert sie, wird diese ausgeliefert (eigener ETag pro
+        Encoding, Vary: Accept-Encoding).
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and urlsplit(self.path).path.endswith('/'):
+            path = os.path.join(path, 'index.html')
+        
+        if not os.path.isfile(path):
+            return super().send_head()
+        
+        st = os.stat(path)
+        encoding, body_path = precompressed_variant(path, st, self.headers.get('Accept-Encoding'))
+        self.etag = file_etag(path, st)
+        if encoding:
+            self.etag = self.etag[:-1] + '-' + encoding + '"'
+        self.vary = True
+        if self.path.startswith('/dashboard/'):
+            self.cache_control = f'public, max-age={STATIC_MAX_AGE}'
+        else:
+            self.cache_control = 'no-cache'
+        
+        if self.not_modified(st):
+            self.send_response(304)
+            self.send_header('Last-Modified', self.date_time_string(int(st.st_mtime)))
+            self.end_headers()
+            return None
+        
+        if not encoding:
+            return super().send_head()
+        
+        f = open(body_path, 'rb')
+        try:
+            self.send_response(200)
+            self.send_header('Content-type', self.guess_type(path))
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.send_header('Last-Modified', self.date_time_string(int(st.st_mtime)))
+            self.end_headers()
+            return f
+        except:
+            f.close()
+            raise
+    
     def do_POST(self):
         """Handle POST requests für API endpoints"""
-        if self.path == '/api/refresh':
-            self.handle_refresh()
+        self.cache_control = None
+        self.etag = None
+        self.vary = False
+        self.retry_after = None
+        url = urlsplit(self.path)
+        if url.path == '/api/refresh':
+            self.handle_refresh(parse_qs(url.query))
         elif self.path == '/api/settings':
             self.handle_settings_post()
         else:
             self.send_error(404)
     
-    def handle_refresh(self):
-        """Startet den Crawler im Hintergrund"""
+    def handle_refresh(self, params):
+        """
+        POST /api/refresh[?commodities=butter,kaese]
+        (oder JSON-Body {"commodities": [...]}; ohne Angabe: alle)
+        
+        Reiht einen Crawl ein bzw. legt ihn mit einem wartenden/laufenden
+        zusammen → 202 mit Job-Status, 429 wenn alles gerade erst abgerufen wurde.
+        """
         try:
-            # Starte Crawler asynchron
-            subprocess.Popen(['/usr/local/bin/python3', '/app/crawler.py'],
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL)
+            commodities = [c for c in params.get('commodities', [''])[0].split(',') if c]
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                try:
+                    body = json.loads(self.rfile.read(length).decode('utf-8'))
+                except ValueError:
+                    raise ApiError(400, 'Ungültiges JSON')
+                if isinstance(body, dict):
+                    commodities += body.get('commodities') or []
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+            job = refresh_queue.submit(commodities or None)
+            self.send_json(dict(job, status='ok', url=f"/api/refresh/{job['id']}",
+                                message='Crawler gestartet'), 202)
+        except ApiError as e:
+            self.retry_after = getattr(e, 'retry_after', None)
+            self.send_json({'status': 'error', 'message': str(e),
+                            'retryAfter': self.retry_after}, e.status)
+    
+    def handle_refresh_status(self, job_id):
+        """GET /api/refresh/<id> → Status, Fortschritt und Ergebnis pro Rohstoff"""
+        job = refresh_queue.get(job_id)
+        if job is None:
+            self.send_json({'status': 'error', 'message': f'Unbekannter Job: {job_id}'}, 404)
+            return
+        self.send_json(job)
+    
+    def send_json(self, data, status=200):
+        body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def handle_prices(self, params):
+        """
+        GET /api/prices?commodity=butter&period=1m[&points=200][&method=lttb|minmax]
+        GET /api/prices?commodity=butter&from=2025-01-01&to=2025-06-30[&points=200]
+        
+        Liefert nur die Punkte, die das Chart zeichnet (optional auf max.
+        `points` Punkte reduziert, gecacht pro Store-Generation). Stats
+        beziehen sich auf den vollen Zeitraum.
+        """
+        try:
+            data = chart_cache.get(
+                crawler.get_store(),
+                params.get('commodity', [''])[0],
+                period=params.get('period', [None])[0],
+                start=params.get('from', [None])[0],
+                end=params.get('to', [None])[0],
+                points=self.points_param(params),
+                method=params.get('method', ['lttb'])[0]
+            )
+            self.send_json(data)
+        except ApiError as e:
+            self.send_json({'status': 'error', 'message': str(e)}, e.status)
+    
+    def handle_metrics(self):
+        """GET /metrics (Prometheus-Textformat): Latenz pro Route, Crawl-Messwerte pro Quelle"""
+        store = crawler.get_store()
+        lines = request_metrics.exposition() + crawl_exposition(store) + [
+            '# HELP rohstoff_store_generation Store-Generation (steigt bei jedem Speichern)',
+            '# TYPE rohstoff_store_generation gauge',
+            f'rohstoff_store_generation {store.generation()}',
+            '# HELP rohstoff_event_clients Offene /api/events-Streams',
+            '# TYPE rohstoff_event_clients gauge',
+            f'rohstoff_event_clients {event_hub.client_count()}',
+        ]
+        body = ('\n'.join(lines) + '\n').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def handle_events(self):
+        """
+        GET /api/events (text/event-stream)
+        
+        Events "hello" ({generation}) und "prices" (Delta pro Rohstoff, siehe
+        EventHub). Der Socket wird an den EventHub übergeben, der Worker ist
+        danach sofort wieder frei.
+        """
+        detach = getattr(self.server, 'detach', None)
+        if detach is None or event_hub.full():
+            self.retry_after = 60
+            self.send_json({'status': 'error', 'message': 'Keine Event-Streams verfügbar'}, 503)
+            return
+        
+        self.cache_control = 'no-cache'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.end_headers()
+        self.wfile.flush()
+        
+        self.close_connection = True
+        detach(self.request)
+        event_hub.add(self.request)
+    
+    def handle_snapshot(self, params):
+        """
+        GET /api/snapshot?period=1m[&points=250][&method=lttb|minmax]
+        
+        Alle Rohstoffe in einer Antwort (gleiches Format wie /api/prices pro
+        Rohstoff), aus dem Cache, mit ETag → 304 wenn unverändert.
+        """
+        try:
+            period = params.get('period', [None])[0] or crawler.load_config().get('defaultPeriod', '1m')
+            body, etag, gzipped = snapshot_cache.get(
+                crawler.get_store(), period, self.points_param(params), params.get('method', ['lttb'])[0]
+            )
+        except ApiError as e:
+            self.send_json({'status': 'error', 'message': str(e)}, e.status)
+            return
+        
+        use_gzip = 'gzip' in accepted_encodings(self.headers.get('Accept-Encoding'))
+        if use_gzip:
+            body, etag = gzipped, etag[:-1] + '-gzip"'
+        
+        self.cache_control = 'no-cache'
+        self.etag = etag
+        self.vary = True
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
             self.end_headers()
-            response = json.dumps({'status': 'ok', 'message': 'Crawler gestartet'})
-            self.wfile.write(response.encode())
-        except Exception as e:
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json; charset=utf-8')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def points_param(self, params):
+        try:
+            return int(params.get('points', [0])[0]) or None
+        except ValueError:
+            raise ApiError(400, 'points muss eine Zahl sein')
+    
+    def handle_store_export(self, commodity):
+        """
+        Liefert data/<commodity>.json bei Bedarf: Preise aus data/<commodity>.bin
+        (mmap), sonst aus dem PriceStore. Ergebnis wird pro Store-Generation
+        gecacht (ETag → 304).
+        """
+        store = crawler.get_store()
+        generation = store.generation()
+        with _exports_lock:
+            cached = _exports.get(commodity)
+        
+        if cached and cached[0] == generation:
+            body, etag = cached[1], cached[2]
+        else:
+            prices = None
+            path = crawler.series_path(commodity)
+            if path.exists():
+                try:
+                    prices = crawler.read_series_file(path)
+                except (OSError, ValueError) as e:
+                    print(f"{path.name} nicht lesbar: {e}")
+            data = crawler.build_export(commodity, prices)
+            if data is None:
+                self.send_error(404, "File not found")
+                return
+            body = json.dumps(data, separators=(',', ':')).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            with _exports_lock:
+                _exports[commodity] = (generation, body, etag)
+        
+        self.etag = etag
+        self.cache_control = 'no-cache'
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and etag in if_none_match:
+            self.send_response(304)
             self.end_headers()
-            response = json.dumps({'status': 'error', 'message': str(e)})
-            self.wfile.write(response.encode())
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
     
     def handle_settings_get(self):
         """Gibt aktuelle Einstellungen zurück (ohne API Key)"""
@@ -101,34 +1040,35 @@ class DashboardHandler(SimpleHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode('utf-8'))
             
-            # Lade aktuelle Config
-            with open('/app/config.json', 'r') as f:
-                config = json.load(f)
-            
-            # Update Gemini-Settings
-            if 'gemini' in data:
-                if 'gemini' not in config:
-                    config['gemini'] = {}
+            with config_lock:
+                # Lade aktuelle Config
+                with open('/app/config.json', 'r') as f:
+                    config = json.load(f)
                 
-                if 'enabled' in data['gemini']:
-                    config['gemini']['enabled'] = data['gemini']['enabled']
+                # Update Gemini-Settings
+                if 'gemini' in data:
+                    if 'gemini' not in config:
+                        config['gemini'] = {}
                 
-                if 'api_key' in data['gemini']:
-                    # Nur übernehmen wenn nicht leer
-                    key = data['gemini']['api_key'].strip()
-                    if key:
-                        config['gemini']['api_key'] = key
+                    if 'enabled' in data['gemini']:
+                        config['gemini']['enabled'] = data['gemini']['enabled']
                 
-                if 'model' in data['gemini']:
-                    config['gemini']['model'] = data['gemini']['model']
-            
-            # Update defaultPeriod
-            if 'defaultPeriod' in data:
-                config['defaultPeriod'] = data['defaultPeriod']
-            
-            # Speichere Config
-            with open('/app/config.json', 'w') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+                    if 'api_key' in data['gemini']:
+                        # Nur übernehmen wenn nicht leer
+                        key = data['gemini']['api_key'].strip()
+                        if key:
+                            config['gemini']['api_key'] = key
+                
+                    if 'model' in data['gemini']:
+                        config['gemini']['model'] = data['gemini']['model']
+                
+                # Update defaultPeriod
+                if 'defaultPeriod' in data:
+                    config['defaultPeriod'] = data['defaultPeriod']
+                
+                # Speichere Config
+                with open('/app/config.json', 'w') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
             
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -142,23 +1082,199 @@ class DashboardHandler(SimpleHTTPRequestHandler):
             response = json.dumps({'status': 'error', 'message': str(e)})
             self.wfile.write(response.encode())
     
+    def parse_request(self):
+        # Zeitmessung ab gelesener Request-Zeile (Keep-Alive-Leerlauf zählt nicht mit)
+        self.started = time.perf_counter()
+        return super().parse_request()
+    
+    def handle_one_request(self):
+        self.started = None
+        super().handle_one_request()
+        if self.started is not None and getattr(self, 'command', None):
+            request_metrics.observe(route_of(self.path), self.command, time.perf_counter() - self.started)
+    
     def end_headers(self):
         # CORS headers
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        self.send_header('Cache-Control', getattr(self, 'cache_control', None) or 'no-store, no-cache, must-revalidate')
+        if getattr(self, 'etag', None):
+            self.send_header('ETag', self.etag)
+        if getattr(self, 'vary', False):
+            self.send_header('Vary', 'Accept-Encoding')
+        if getattr(self, 'retry_after', None):
+            self.send_header('Retry-After', str(self.retry_after))
         super().end_headers()
     
     def log_message(self, format, *args):
         # Logging reduzieren
-        if not self.path.endswith('.json'):
+        if not self.path.endswith('.json') and not self.path.startswith(('/api/prices', '/api/snapshot', '/metrics')):
             super().log_message(format, *args)
 
-def run(server_class=HTTPServer, handler_class=DashboardHandler, port=8080):
+def downsample_lttb(series, points):
+    """
+    Largest-Triangle-Three-Buckets: reduziert auf max. `points` Punkte.
+    
+    Erster und letzter Punkt bleiben exakt erhalten (aktueller Preis und
+    Veränderung in %). Dazwischen wird pro Bucket der echte Punkt behalten,
+    der mit dem zuletzt gewählten Punkt und dem Mittel des nächsten Buckets
+    das größte Dreieck bildet – Spitzen und Einbrüche bleiben sichtbar.
+    """
+    n = len(series)
+    if n <= points or points < 3:
+        return series
+    
+    days, prices = series.days, series.prices
+    every = (n - 2) / (points - 2)
+    keep = [0]
+    a = 0
+    for i in range(points - 2):
+        # Mittelpunkt des nächsten Buckets (beim letzten: der letzte Punkt)
+        lo, hi = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        avg_x = sum(days[lo:hi]) / (hi - lo)
+        avg_y = sum(prices[lo:hi]) / (hi - lo)
+        
+        ax, ay = days[a], prices[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (prices[j] - ay) - (ax - days[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    
+    return crawler.PriceSeries((days[i] for i in keep), (prices[i] for i in keep))
+
+
+def downsample_minmax(series, points):
+    """
+    Min/Max-Bucketing: reduziert auf max. `points` Punkte.
+    
+    Erster und letzter Punkt bleiben exakt; pro Bucket werden Minimum und
+    Maximum in zeitlicher Reihenfolge behalten (Ausschläge bleiben exakt).
+    """
+    if points < 4:
+        return downsample_lttb(series, points)
+    n = len(series)
+    if n <= points:
+        return series
+    
+    days, prices = series.days, series.prices
+    buckets = (points - 2) // 2
+    size = (n - 2) / buckets
+    keep = [0]
+    for i in range(buckets):
+        lo, hi = int(i * size) + 1, int((i + 1) * size) + 1
+        bucket = range(lo, hi)
+        low = min(bucket, key=prices.__getitem__)
+        high = max(bucket, key=prices.__getitem__)
+        keep.extend(sorted({low, high}))
+    keep.append(n - 1)
+    
+    return crawler.PriceSeries((days[i] for i in keep), (prices[i] for i in keep))
+
+
+# ?method=... für /api/prices und /api/snapshot
+DOWNSAMPLE_METHODS = {
+    'lttb': downsample_lttb,
+    'minmax': downsample_minmax,
+}
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer, der Verbindungen in einem festen Thread-Pool abarbeitet.
+    
+    Ein langsamer Client oder ein POST mit Datei-I/O blockiert so nicht
+    alle anderen Kiosks (und den Docker-Healthcheck). Mehr als
+    max_connections gleichzeitige Verbindungen (laufend + wartend) werden
+    sofort mit 503 abgewiesen statt sich unbegrenzt zu stauen.
+    """
+    
+    def __init__(self, server_address, handler_class,
+                 workers=DEFAULT_WORKERS, max_connections=DEFAULT_MAX_CONNECTIONS):
+        super().__init__(server_address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+        self.connection_slots = threading.BoundedSemaphore(max_connections)
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+    
+    def detach(self, request):
+        """Socket bleibt nach dem Request offen (gehört dann z.B. dem EventHub)"""
+        with self._detached_lock:
+            self._detached.add(request)
+    
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            self.reject_request(request)
+            return
+        self.pool.submit(self.process_request_thread, request, client_address)
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._detached_lock:
+                detached = request in self._detached
+                self._detached.discard(request)
+            if not detached:
+                self.shutdown_request(request)
+            self.connection_slots.release()
+    
+    def reject_request(self, request):
+        try:
+            request.sendall(b'HTTP/1.0 503 Service Unavailable\r\n'
+                            b'Retry-After: 1\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+        except OSError:
+            pass
+        self.shutdown_request(request)
+    
+    def server_close(self):
+        super().server_close()
+        # Laufende Requests noch zu Ende bedienen
+        self.pool.shutdown(wait=True)
+
+
+def run(server_class=None, handler_class=DashboardHandler, port=8080,
+        workers=DEFAULT_WORKERS, max_connections=DEFAULT_MAX_CONNECTIONS):
     server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
+    if server_class is None:
+        httpd = PooledHTTPServer(server_address, handler_class, workers, max_connections)
+    else:
+        httpd = server_class(server_address, handler_class)
+    precompress_static('/app/dashboard')
+    warm_etags('/app/dashboard')
+    
+    # Graceful Shutdown (docker stop → SIGTERM): keine neuen Verbindungen,
+    # laufende Requests fertig bedienen, dann beenden
+    def stop(signum, frame):
+        print("Server wird beendet...")
+        threading.Thread(target=httpd.shutdown).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
     print(f"Server läuft auf Port {port}...")
     print(f"Dashboard: http://localhost:{port}/dashboard/")
-    httpd.serve_forever()
+    try:
+        httpd.serve_forever()
+    finally:
+        event_hub.close()
+        httpd.server_close()
+        # Browser bleibt für Refresh-Jobs offen, bis der Server endet
+        crawler.close_browser_service()
 
 if __name__ == '__main__':
-    run()
+    parser = argparse.ArgumentParser(description='Rohstoff-Dashboard Server')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--mode', choices=['threaded', 'single'], default='threaded',
+                        help='threaded: Thread-Pool (Standard), single: ein Request nach dem anderen')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Worker-Threads im threaded-Modus')
+    parser.add_argument('--max-connections', type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help='Max. gleichzeitige Verbindungen, darüber 503')
+    args = parser.parse_args()
+    
+    run(server_class=HTTPServer if args.mode == 'single' else None,
+        port=args.port, workers=args.workers, max_connections=args.max_connections)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test der Extraktion (EXTRACTION_SPECS): Seitenbereiche und Selector-Priorität"""
+
+import sys
+
+import crawler
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures
+    print(f"{'✅' if ok else '❌'} {name}" + (f" ({detail})" if detail else ""))
+    if not ok:
+        failures += 1
+
+
+print("=== TEST: Seitenbereich (region) ===\n")
+
+# Plausibler Preis in der Navigation VOR dem Kopfbereich und in einer
+# Regionen-Liste danach - gewinnen darf nur der Deutschland-Durchschnitt
+esyoil_html = """<html><body>
+<nav><a href="/angebot">Sonderangebot 89,99 €</a></nav>
+<div><span class="text-[1.75rem] font-bold leading-none">96,61 €</span> pro 100 Liter</div>
+""" + "<p>Lorem ipsum dolor sit amet</p>\n" * 20 + """
+<ul><li>Region Nord 104,20 €</li></ul>
+</body></html>"""
+result = crawler.extract("esyoil", esyoil_html)
+check("esyoil: Preis vor dem Kopfbereich ignoriert", result.raw == 96.61, f"gefunden: {result.raw}")
+
+region = crawler._region(crawler.EXTRACTION_SPECS["esyoil"], esyoil_html)
+check("esyoil: Regionen-Preis liegt außerhalb des Bereichs", "104,20" not in region, f"{len(region)} Zeichen")
+
+# Käse: Datumszeile in einem Teaser vor und einer Tabelle nach der Preistabelle
+cheese_html = """<html><body>
+<div class="teaser">News 02 Jan 2026 4.100 Butter steigt</div>
+<table class="menu"><tr><td>Menü</td></tr></table>
+<table class="prices">
+<tr><td>18 Feb 2026   3.402   -10,1%</td></tr>
+<tr><td>11 Feb 2026   3.780   +1,2%</td></tr>
+</table>
+<table class="other"><tr><td>04 Feb 2026   5.000   +0,0%</td></tr></table>
+</body></html>"""
+result = crawler.extract("clal_cheese", cheese_html)
+dates = [crawler.PriceSeries.date_of(d) for d in result.series.days]
+check("clal_cheese: nur Zeilen der Preistabelle", dates == ["2026-02-11", "2026-02-18"], f"gefunden: {dates}")
+
+# Butter: Mittwochs-Zeile außerhalb der Tabelle wird nicht mitgenommen
+butter_html = """<html><body>
+<p>Wednesday 01 Jan 2025 9.999 9.999 +1</p>
+<table><tr><td>Wednesday 18 Feb 2026</td><td> 7.100 7.300 +0,5% </td></tr></table>
+<p>Wednesday 07 Jan 2026 8.000 8.200 +1</p>
+</body></html>"""
+result = crawler.extract("clal_butter", butter_html)
+dates = [crawler.PriceSeries.date_of(d) for d in result.series.days]
+check("clal_butter: nur Zeilen der Preistabelle", dates == ["2026-02-18"], f"gefunden: {dates}")
+
+print("\n=== TEST: Selector-Priorität (WSJ) ===\n")
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    def text_content(self):
+        return self.text
+
+
+class FakePage:
+    """query_selector_all() wie Playwright: Elemente in DOM-Reihenfolge"""
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def query_selector_all(self, selector):
+        return [FakeElement(text) for text in self.elements.get(selector, [])]
+
+    def inner_text(self, selector):
+        return "Dow 42,000.00 Weizen $5.55"
+
+
+# Ein unpassendes span[class*="last"] steht im DOM vor dem eigentlichen Kurs
+page = FakePage({
+    'span[class*="last"]': ["Last updated 10:32"],
+    '[data-symbol="W1"] .last-price': ["$5.4725"],
+    '.last-price': ["Last updated", "$5.4725"],
+})
+result = crawler.extract("wsj", page=page)
+check("wsj: spezifischster Selector gewinnt", result.raw == 5.4725 and result.rule == "last-price",
+      f"{result.rule}: {result.raw}")
+
+# Erstes Element eines Selectors parst nicht → nächstes Element bzw. nächster Selector
+page = FakePage({'.last-price': ["--"], '.quote-value': ["$6.10"]})
+result = crawler.extract("wsj", page=page)
+check("wsj: nächster Selector statt Text-Regex", result.raw == 6.10 and result.rule == "last-price",
+      f"{result.rule}: {result.raw}")
+
+print(f"\n=== ERGEBNIS: {'alle Tests bestanden' if not failures else f'{failures} fehlgeschlagen'} ===")
+sys.exit(1 if failures else 0)
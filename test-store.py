@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Test des inkrementellen Speicherns (_save_result): Demo-Daten, dann echter Abruf"""
+
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+import crawler
+
+failures = 0
+
+
+def check(name, ok, detail=""):
+    global failures
+    print(f"{'✅' if ok else '❌'} {name}" + (f" ({detail})" if detail else ""))
+    if not ok:
+        failures += 1
+
+
+# Eigener Store in einem leeren Verzeichnis - data/ bleibt unberührt
+crawler.DATA_DIR = Path(tempfile.mkdtemp(prefix="rohstoff-test-"))
+crawler._store = crawler.PriceStore(crawler.DATA_DIR / "prices.db")
+store = crawler.get_store()
+meta = crawler.COMMODITIES["butter"]
+
+print("=== TEST: Demo-Daten, dann echter Abruf ===\n")
+
+# Erster Lauf: Quelle nicht erreichbar, noch nichts gespeichert → Demo-Daten
+status = crawler._save_result("butter", meta, crawler.fetch_butter_fallback())
+check("Demo-Daten gespeichert", status == "saved" and store.count("butter") == 91, f"{status}, {store.count('butter')} Punkte")
+check("Demo-Daten markiert", store.is_demo("butter"), f"stale: {store.get_meta('butter')['stale']}")
+
+# Zweiter Lauf: Quelle wieder erreichbar, 700 Tage echte Historie bis heute
+today = date.today()
+real = crawler.PriceSeries()
+for i in range(699, -1, -1):
+    real.append(today - timedelta(days=i), 7000.0 + i)
+status = crawler._save_result("butter", meta, real, incremental=True)
+
+saved = store.series("butter")
+check("echte Historie komplett gespeichert", saved == real, f"{status}, {len(saved)} Punkte")
+check("Markierung entfernt", store.get_meta("butter")["stale"] is None and not store.is_demo("butter"))
+
+# Dritter Lauf: wieder inkrementell - nur der neue Tag kommt dazu
+newer = crawler.PriceSeries()
+newer.append(today, 6999.0)
+newer.append(today + timedelta(days=1), 6998.0)
+crawler._save_result("butter", meta, newer, incremental=True)
+check("danach wieder inkrementell", store.count("butter") == 701 and store.series("butter", last=1).last_price == 6998.0,
+      f"{store.count('butter')} Punkte")
+
+# Quelle fällt aus: echte Historie bleibt, keine neuen Demo-Daten
+status = crawler._save_result("butter", meta, crawler.fetch_butter_fallback())
+check("Ausfall nach echten Daten: Historie bleibt", status == "stale" and store.count("butter") == 701
+      and not store.is_demo("butter"), f"{status}, {store.count('butter')} Punkte")
+
+print(f"\n=== ERGEBNIS: {'alle Tests bestanden' if not failures else f'{failures} fehlgeschlagen'} ===")
+sys.exit(1 if failures else 0)